@@ -0,0 +1,199 @@
+# _kernels.py — fused indicator kernel (Numba) สำหรับ xau_once.py
+# EMA fast/slow + RSI (Wilder) + MACD 12/26/9 + ATR (Wilder) ในลูปเดียว
+#
+# AOT: `python _kernels.py` จะ build xau_kernels.*.so ไว้ข้าง ๆ ไฟล์นี้
+# xau_once.py จะลอง import xau_kernels ก่อน ไม่มีค่อย fallback มา @njit (cache ลง NUMBA_CACHE_DIR)
+# ถ้าไม่มี numba เลย: ช่วง seed เดินทีละแท่งด้วย Python แล้วที่เหลือใช้ scipy lfilter (IIR ขั้วเดียว)
+# ไม่มี scipy ด้วย (ไม่ได้อยู่ใน requirements.txt) → เดินทีละแท่งด้วย Python ล้วน
+
+import os
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+MACD_FAST, MACD_SLOW, MACD_SIG = 12, 26, 9
+# α ของ MACD คงที่ → คิดครั้งเดียว (numba มองเป็นค่าคงที่ตอน compile)
+A12, A26, A_SIG = 2.0 / (MACD_FAST + 1.0), 2.0 / (MACD_SLOW + 1.0), 2.0 / (MACD_SIG + 1.0)
+
+# state (float64[10]) — ช่วง warm-up ค่า EMA/MACD/ATR จะเป็นผลรวมสำหรับ SMA seed ก่อน
+# [0] จำนวนแท่งที่ป้อนแล้ว, [1] ema_fast, [2] ema_slow, [3] ema12, [4] ema26,
+# [5] macd_sig, [6] avg_gain, [7] avg_loss, [8] atr, [9] prev_close
+
+# ลำดับค่าใน row / คอลัมน์ใน out (N, 7): ema_fast, ema_slow, rsi, macd, macd_signal, macd_hist, atr
+# ราคา (c/h/l) รับเป็น float32 ได้ แต่ state กับ out เป็น float64 เสมอ
+
+
+def _step(state, h, l, c, fast, slow, rsi_len, atr_len, row):
+    i = int(state[0])
+    row[:] = np.nan
+
+    a_fast = 2.0 / (fast + 1.0)
+    a_slow = 2.0 / (slow + 1.0)
+    w_rsi  = 1.0 / rsi_len  # Wilder = EMA ที่ α = 1/p
+    w_atr  = 1.0 / atr_len
+
+    ema_fast = state[1]; ema_slow = state[2]; ema12 = state[3]; ema26 = state[4]
+    macd_sig = state[5]; avg_gain = state[6]; avg_loss = state[7]; atr = state[8]
+    prev_close = state[9]
+
+    # --- EMA fast/slow (SMA seed ที่ i == period-1)
+    if i < fast:
+        ema_fast += c
+        if i == fast - 1:
+            ema_fast /= fast
+    else:
+        ema_fast += a_fast * (c - ema_fast)
+    if i >= fast - 1:
+        row[0] = ema_fast
+
+    if i < slow:
+        ema_slow += c
+        if i == slow - 1:
+            ema_slow /= slow
+    else:
+        ema_slow += a_slow * (c - ema_slow)
+    if i >= slow - 1:
+        row[1] = ema_slow
+
+    # --- RSI (Wilder) — แบบเดียวกับ ta: ewm(alpha=1/p, adjust=False) เริ่มจาก gain/loss = 0 ที่ i=0
+    # (ไม่มี SMA seed) และเริ่มมีค่าที่ i == rsi_len-1; avg_loss == 0 → 100
+    if i > 0:
+        dc = c - prev_close
+        gain = dc if dc > 0.0 else 0.0
+        loss = -dc if dc < 0.0 else 0.0
+        avg_gain += w_rsi * (gain - avg_gain)
+        avg_loss += w_rsi * (loss - avg_loss)
+    if i >= rsi_len - 1:
+        if avg_loss == 0.0:
+            row[2] = 100.0
+        else:
+            row[2] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    # --- MACD 12/26/9
+    if i < MACD_FAST:
+        ema12 += c
+        if i == MACD_FAST - 1:
+            ema12 /= MACD_FAST
+    else:
+        ema12 += A12 * (c - ema12)
+    if i < MACD_SLOW:
+        ema26 += c
+        if i == MACD_SLOW - 1:
+            ema26 /= MACD_SLOW
+    else:
+        ema26 += A26 * (c - ema26)
+    if i >= MACD_SLOW - 1:
+        macd = ema12 - ema26
+        row[3] = macd
+        k = i - (MACD_SLOW - 1)
+        if k < MACD_SIG:
+            macd_sig += macd
+            if k == MACD_SIG - 1:
+                macd_sig /= MACD_SIG
+        else:
+            macd_sig += A_SIG * (macd - macd_sig)
+        if k >= MACD_SIG - 1:
+            row[4] = macd_sig
+            row[5] = macd - macd_sig
+
+    # --- ATR (Wilder) — TR แท่งแรกใช้ h-l
+    tr = h - l
+    if i > 0:
+        tr = max(tr, abs(h - prev_close), abs(l - prev_close))
+    if i < atr_len:
+        atr += tr
+        if i == atr_len - 1:
+            atr /= atr_len
+    else:
+        atr += w_atr * (tr - atr)
+    if i >= atr_len - 1:
+        row[6] = atr
+
+    state[0] = i + 1
+    state[1] = ema_fast; state[2] = ema_slow; state[3] = ema12; state[4] = ema26
+    state[5] = macd_sig; state[6] = avg_gain; state[7] = avg_loss; state[8] = atr
+    state[9] = c
+
+
+def _compute_all(c, h, l, out, state, fast, slow, rsi_len, atr_len):
+    # ป้อนทุกแท่งต่อจาก state ที่ให้มา (state ศูนย์ทั้งหมด = เริ่มใหม่)
+    for i in range(c.shape[0]):
+        step(state, h[i], l[i], c[i], fast, slow, rsi_len, atr_len, out[i])
+
+
+def _ema(x, a, y0):
+    # y[n] = a*x[n] + (1-a)*y[n-1] ต่อจาก y0 — ใช้ได้ทั้ง EMA (a=2/(p+1)) และ Wilder (a=1/p)
+    y, _ = lfilter([a], [1.0, a - 1.0], x, zi=[(1.0 - a) * y0])
+    return y
+
+
+def _compute_all_lfilter(c, h, l, out, state, fast, slow, rsi_len, atr_len):
+    # ผลเท่ากับ _compute_all แต่หลังพ้นช่วง SMA seed แล้วคำนวณทั้งก้อนด้วย lfilter
+    n = c.shape[0]
+    warm = max(fast, slow, rsi_len, MACD_SLOW - 1 + MACD_SIG, atr_len)
+    i0 = 0
+    while i0 < n and state[0] < warm:
+        _step(state, h[i0], l[i0], c[i0], fast, slow, rsi_len, atr_len, out[i0])
+        i0 += 1
+    if i0 == n:
+        return
+
+    x  = c[i0:].astype(np.float64)
+    hh = h[i0:].astype(np.float64)
+    ll = l[i0:].astype(np.float64)
+    pc = np.concatenate(([state[9]], x[:-1]))
+
+    ema_fast = _ema(x, 2.0 / (fast + 1.0), state[1])
+    ema_slow = _ema(x, 2.0 / (slow + 1.0), state[2])
+    ema12    = _ema(x, A12, state[3])
+    ema26    = _ema(x, A26, state[4])
+    macd     = ema12 - ema26
+    macd_sig = _ema(macd, A_SIG, state[5])
+
+    dc = x - pc
+    avg_gain = _ema(np.maximum(dc, 0.0), 1.0 / rsi_len, state[6])
+    avg_loss = _ema(np.maximum(-dc, 0.0), 1.0 / rsi_len, state[7])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0.0, 100.0, rsi)
+
+    tr  = np.maximum(hh - ll, np.maximum(np.abs(hh - pc), np.abs(ll - pc)))
+    atr = _ema(tr, 1.0 / atr_len, state[8])
+
+    out[i0:, 0] = ema_fast
+    out[i0:, 1] = ema_slow
+    out[i0:, 2] = rsi
+    out[i0:, 3] = macd
+    out[i0:, 4] = macd_sig
+    out[i0:, 5] = macd - macd_sig
+    out[i0:, 6] = atr
+
+    state[0] += n - i0
+    state[1] = ema_fast[-1]; state[2] = ema_slow[-1]; state[3] = ema12[-1]; state[4] = ema26[-1]
+    state[5] = macd_sig[-1]; state[6] = avg_gain[-1]; state[7] = avg_loss[-1]; state[8] = atr[-1]
+    state[9] = x[-1]
+
+
+if njit is not None:
+    step = njit(cache=True, fastmath=True)(_step)
+    compute_all = njit(cache=True, fastmath=True)(_compute_all)
+else:
+    step = _step
+    try:
+        from scipy.signal import lfilter
+        compute_all = _compute_all_lfilter
+    except ImportError:
+        compute_all = _compute_all
+
+
+if __name__ == "__main__":
+    from numba.pycc import CC
+
+    cc = CC("xau_kernels")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export("step", "void(f8[:], f8, f8, f8, i8, i8, i8, i8, f8[:])")(_step)
+    cc.export("compute_all", "void(f4[:], f4[:], f4[:], f8[:, :], f8[:], i8, i8, i8, i8)")(_compute_all)
+    cc.compile()
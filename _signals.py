@@ -0,0 +1,16 @@
+# _signals.py — สัญญาณ EMA cross + ฟิลเตอร์ RSI/MACD แบบ vectorized (NumPy)
+# คืนค่า int8 ต่อแท่ง: +1 BUY, -1 SELL, 0 WAIT (แท่งแรกไม่มีแท่งก่อนหน้า → 0)
+
+import numpy as np
+
+
+def signals(ema_f, ema_s, rsi, macd, sig, hist, rsi_buy_min, rsi_sell_max, hist_min):
+    cross_up = (ema_f[:-1] <= ema_s[:-1]) & (ema_f[1:] > ema_s[1:])
+    cross_dn = (ema_f[:-1] >= ema_s[:-1]) & (ema_f[1:] < ema_s[1:])
+    # ฟิลเตอร์เข้มขึ้นด้วย RSI และ MACD histogram
+    buy_ok  = (rsi[1:] >= rsi_buy_min)  & (hist[1:] >= hist_min)  & (macd[1:] > sig[1:])
+    sell_ok = (rsi[1:] <= rsi_sell_max) & (hist[1:] <= -hist_min) & (macd[1:] < sig[1:])
+
+    out = np.zeros(len(ema_f), dtype=np.int8)
+    out[1:] = (cross_up & buy_ok).astype(np.int8) - (cross_dn & sell_ok).astype(np.int8)
+    return out
@@ -0,0 +1,54 @@
+# _streaming.py — state อินดิเคเตอร์แบบ streaming ข้ามรอบ (pickle ต่อสัญลักษณ์)
+# เก็บ state ของ kernel ณ แท่งล่าสุดที่ปิดแล้ว + ค่าอินดิเคเตอร์ของแท่งนั้น
+# รอบถัดไปป้อนเฉพาะแท่งใหม่ ไม่ต้องคำนวณย้อนทั้งประวัติ
+# ราคาใน method ของคลาสนี้เรียงเป็น h, l, c เสมอ (สลับให้ตรง kernel ข้างในเอง)
+
+import pickle
+import numpy as np
+
+STATE_LEN = 10  # layout ดูใน _kernels.py
+N_COLS    = 7   # ema_fast, ema_slow, rsi, macd, macd_signal, macd_hist, atr
+
+
+class StreamingIndicators:
+    __slots__ = ("periods", "time", "state", "row")
+
+    def __init__(self, periods):
+        self.periods = tuple(periods)  # (fast, slow, rsi_len, atr_len)
+        self.time    = None            # เวลาแท่งล่าสุดที่ป้อนเข้า state แล้ว
+        self.state   = np.zeros(STATE_LEN)
+        self.row     = np.full(N_COLS, np.nan)
+
+    def update(self, compute_all, t, h, l, c):
+        # ป้อนแท่งที่ปิดแล้วต่อจาก state เดิม (t = เวลาของแท่งสุดท้ายใน h/l/c)
+        if len(c) == 0:
+            return
+        out = np.full((len(c), N_COLS), np.nan)
+        compute_all(c, h, l, out, self.state, *self.periods)
+        self.time = t
+        self.row  = out[-1].copy()
+
+    def peek(self, step, h, l, c):
+        # ค่าของแท่งที่อาจยังไม่ปิด: คำนวณบนสำเนา state ไม่แตะ state จริง
+        row = np.full(N_COLS, np.nan)
+        step(self.state.copy(), h, l, c, *self.periods, row)
+        return row
+
+    def save(self, sym, path):
+        try:
+            with open(path, "wb") as f:
+                pickle.dump(self, f)
+        except Exception as e:
+            print(f"[state] {sym} write failed: {e}")
+
+    @staticmethod
+    def load(sym, path):
+        try:
+            with open(path, "rb") as f:
+                st = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[state] {sym} read failed: {e}")
+            return None
+        return st if isinstance(st, StreamingIndicators) else None
@@ -1,14 +1,26 @@
 # xau_once.py — run-once checker for GitHub Actions (free)
 # Strategy: EMA20/50 cross + RSI + MACD + MACD histogram (strict), TF=5m
 
-import os, sys, requests
+# yfinance / requests / orjson / kernel (numba) import ตอนใช้จริงเท่านั้น (memo hit ไม่ต้องจ่าย)
+# เช็ค env ก่อน import numpy/pandas → ทาง Missing env ออกได้ทันทีโดยไม่ต้องโหลดอะไรหนัก ๆ
+import os, sys
+
+TG_TOKEN = os.getenv("TG_TOKEN")
+TG_CHAT  = os.getenv("TG_CHAT")
+if not TG_TOKEN or not TG_CHAT:
+    print("Missing TG_TOKEN or TG_CHAT", file=sys.stderr); sys.exit(1)
+try:
+    TG_CHAT = int(TG_CHAT)
+except:
+    pass
+
+import math, time, pickle, hashlib, functools, atexit
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from zoneinfo import ZoneInfo
-from datetime import datetime, timezone
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import AverageTrueRange
+from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from _signals import signals
+from _streaming import StreamingIndicators
 
 # ======= CONFIG (ปรับได้) =====================================
 # รายการ "ชุดสัญลักษณ์" ที่จะเช็คทีละชุด (ตัวแรกคือหลัก, ตัวหลัง ๆ คือ fallback)
@@ -18,9 +30,19 @@ INSTRUMENTS = [
 ]
 
 INTERVAL = "5m"
-PERIOD   = "30d"
+PERIOD   = "5d"    # ดึงเต็มเมื่อยังไม่มี cache หรือ cache เก่าเกิน
+PERIOD_INCR = "1d" # ดึงแค่ส่วนท้ายเมื่อ cache ยังใหม่
 BARS     = 220
 
+# cache แท่งเทียนข้ามรอบ (ให้ actions/cache เก็บ /tmp/xau_cache_*.parquet)
+CACHE_DIR = "/tmp"
+CACHE_MAX_AGE_MIN = 120.0
+# state อินดิเคเตอร์ต่อจากรอบก่อน (/tmp/xau_state_*.pkl): แท่งใหม่เกินนี้ให้คำนวณใหม่ทั้งหมด (reseed)
+STATE_MAX_GAP = 6
+# memo ผลลัพธ์ fetch/indicator ภายในแท่งเดียวกัน (cron ยิงซ้ำในแท่งเดิม) — ช่วงละ 1 แท่งของ INTERVAL
+MEMO_DIR = "/tmp/xau_fetch"
+MEMO_TTL_SEC = int(pd.Timedelta(INTERVAL).total_seconds())
+
 # ส่งแจ้งเตือนเฉพาะเมื่อแท่งล่าสุดเพิ่งปิดภายในกี่นาที (กันซ้ำ/กัน stale)
 FRESH_WINDOW_MIN = 10.0
 
@@ -31,22 +53,35 @@ MACD_HIST_MIN = 0.02  # ต้องมากกว่าค่านี้ (BUY
 
 FAST_EMA, SLOW_EMA = 20, 50
 RSI_LEN,  ATR_LEN  = 14, 14
+
+# เวลาไทย UTC+7 คงที่ (ไม่มี DST) → ใช้ offset ตายตัว ไม่ต้องโหลด ZoneInfo
+BKK = timezone(timedelta(hours=7))
 # ===============================================================
 
-TG_TOKEN = os.getenv("TG_TOKEN")
-TG_CHAT  = os.getenv("TG_CHAT")
-if not TG_TOKEN or not TG_CHAT:
-    print("Missing TG_TOKEN or TG_CHAT", file=sys.stderr); sys.exit(1)
-try:
-    TG_CHAT = int(TG_CHAT)
-except:
-    pass
+def _session(pool: int, **headers):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    sess = requests.Session()
+    sess.headers.update(headers)
+    sess.mount("https://", HTTPAdapter(pool_connections=pool, pool_maxsize=pool,
+                                       max_retries=Retry(total=2, backoff_factor=0.3)))
+    atexit.register(sess.close)
+    return sess
+
+# ใช้ connection เดิมซ้ำ (keep-alive) ข้ามการส่งหลายครั้ง — สร้างตอนส่งครั้งแรก
+@functools.cache
+def _tg_session():
+    return _session(2)
 
 def send_tg(text: str):
+    import requests, orjson
     try:
-        r = requests.post(
+        # body เป็น JSON UTF-8 ดิบจาก orjson (ข้อความไทยไม่ถูก escape เป็น \uXXXX / %XX)
+        r = _tg_session().post(
             f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage",
-            data={"chat_id": TG_CHAT, "text": text},
+            data=orjson.dumps({"chat_id": TG_CHAT, "text": text}),
+            headers={"Content-Type": "application/json"},
             timeout=(5, 10)  # (connect timeout, read timeout) วินาที
         )
         r.raise_for_status()  # ถ้า HTTP != 200 จะ throw error ให้จับด้านล่าง
@@ -55,6 +90,112 @@ def send_tg(text: str):
     except requests.RequestException as e:
         print("Telegram error:", e)
 
+def _cache_path(sym: str) -> str:
+    return os.path.join(CACHE_DIR, f"xau_cache_{sym}.parquet")
+
+def _load_cache(sym: str):
+    path = _cache_path(sym)
+    if not os.path.exists(path):
+        return None
+    try:
+        old = pd.read_parquet(path)
+    except Exception as e:
+        print(f"[cache] {sym} read failed: {e}")
+        return None
+    if old.empty:
+        return None
+    age_min = (datetime.now(timezone.utc) - old["time"].max()).total_seconds() / 60.0
+    return old if age_min < CACHE_MAX_AGE_MIN else None
+
+def _save_cache(sym: str, df: pd.DataFrame):
+    try:
+        df.to_parquet(_cache_path(sym), index=False)
+    except Exception as e:
+        print(f"[cache] {sym} write failed: {e}")
+
+def disk_memoize(ttl_seconds: int = MEMO_TTL_SEC, path: str = MEMO_DIR):
+    # key = (ชื่อฟังก์ชัน, args, INTERVAL, PERIOD, ช่วงเวลายาว ttl_seconds ปัจจุบัน) → pickle ไฟล์ละ key
+    # ช่วงเปลี่ยน = key เปลี่ยน ไฟล์เดิมจึงหมดอายุเองโดยไม่ต้องเช็ค mtime ตอนอ่าน
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bucket = int(time.time() // ttl_seconds)
+            try:
+                raw = pickle.dumps((fn.__qualname__, args, kwargs, INTERVAL, PERIOD, bucket))
+                key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            except Exception:
+                return fn(*args, **kwargs)
+            file = os.path.join(path, f"{fn.__name__}_{key}.pkl")
+            try:
+                with open(file, "rb") as f:
+                    return pickle.load(f)
+            except Exception:
+                pass
+            res = fn(*args, **kwargs)
+            try:
+                os.makedirs(path, exist_ok=True)
+                with open(file, "wb") as f:
+                    pickle.dump(res, f)
+            except Exception as e:
+                print(f"[memo] {fn.__name__} write failed: {e}")
+            # ลบไฟล์ที่เกิน TTL (ของแท่งก่อน ๆ จะไม่ถูกอ่านอีกแล้ว) ไม่ให้โฟลเดอร์โตไม่จบ
+            now = time.time()
+            try:
+                with os.scandir(path) as it:
+                    for ent in it:
+                        if ent.name.endswith(".pkl") and now - ent.stat().st_mtime >= ttl_seconds:
+                            try:
+                                os.remove(ent.path)
+                            except OSError:
+                                pass
+            except OSError:
+                pass
+            return res
+        return wrapper
+    return deco
+
+CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{sym}"
+
+# session ของฝั่ง Yahoo (ทั้ง chart ตรงและ yfinance) — keep-alive ไม่ต้อง resolve DNS/TLS ใหม่ทุกครั้ง
+@functools.cache
+def _yf_session():
+    return _session(4, **{"User-Agent": "Mozilla/5.0"})
+
+def _fetch_chart(sym: str, period: str) -> pd.DataFrame:
+    # ยิง endpoint chart ของ Yahoo ตรง ๆ แล้ว decode ด้วย orjson (ไม่ผ่าน yfinance/MultiIndex)
+    import orjson
+    r = _yf_session().get(
+        CHART_URL.format(sym=sym),
+        params={"interval": INTERVAL, "range": period},
+        timeout=(5, 10)
+    )
+    r.raise_for_status()
+    res = orjson.loads(r.content)["chart"]["result"]
+    if not res or not res[0].get("timestamp"):
+        raise RuntimeError("chart empty")
+    res = res[0]
+    q   = res["indicators"]["quote"][0]
+    n   = len(res["timestamp"])
+    vol = q.get("volume") or [0]*n
+    out = pd.DataFrame({
+        # Unix seconds → datetime64 ทั้งก้อน แล้วติด tz UTC (ไม่ parse ทีละแถว)
+        "time": pd.DatetimeIndex(np.asarray(res["timestamp"], dtype="datetime64[s]").astype("datetime64[ns]"),
+                                 tz="UTC"),
+        "o": np.asarray(q["open"],  dtype=np.float64),
+        "h": np.asarray(q["high"],  dtype=np.float64),
+        "l": np.asarray(q["low"],   dtype=np.float64),
+        "c": np.asarray(q["close"], dtype=np.float64),
+        "v": np.nan_to_num(np.asarray(vol, dtype=np.float64)),
+    })
+    # เลียนแบบ fix_Yahoo_returning_live_separate ของ yfinance: Yahoo มักส่ง tick สดเป็นแถวท้ายแยก
+    # เวลาไม่ตรงแท่ง (เช่น 06:45:00 แล้วตามด้วย 06:47:23) → ปัดเวลาลงตาม INTERVAL แล้วรวมแถวแท่งเดียวกัน
+    out["time"] = out["time"].dt.floor(pd.Timedelta(INTERVAL))
+    if out["time"].duplicated().any():
+        out = out.groupby("time", as_index=False, sort=True).agg(
+            {"o": "first", "h": "max", "l": "min", "c": "last", "v": "sum"})
+    return out
+
+@disk_memoize()
 def fetch_df(candidates: list[str]) -> pd.DataFrame:
     def _flatten(df: pd.DataFrame) -> pd.DataFrame:
         if isinstance(df.columns, pd.MultiIndex):
@@ -62,76 +203,106 @@ def fetch_df(candidates: list[str]) -> pd.DataFrame:
             df.columns = ["_".join([str(x) for x in t if x not in ("", None)]) for t in df.columns]
         return df
 
-    def _pick(df: pd.DataFrame, key: str) -> pd.Series:
-        key = key.lower()
-        # ตรงตัวก่อน
+    def _picker(df: pd.DataFrame):
+        # สร้างตาราง lookup ครั้งเดียวต่อ frame (คอลัมน์แรกที่เข้าเงื่อนไขชนะ เหมือนไล่ลูป)
+        exact, suffix, contains = {}, {}, {}
         for c in df.columns:
-            if str(c).lower() == key:
-                return df[c]
-        # ชื่อคอลัมน์ที่ลงท้ายด้วย key (เช่น 'GC=F_Open' หรือ 'Open_GC=F')
-        for c in df.columns:
-            s = str(c).lower()
-            if s.endswith(key):
-                return df[c]
-        # มีคำว่า key อยู่ข้างใน
-        for c in df.columns:
-            if key in str(c).lower():
-                return df[c]
-        raise KeyError(key)
+            exact.setdefault(str(c).lower(), c)
+        for s, c in exact.items():
+            for key in ("open", "high", "low", "close", "volume"):
+                # ชื่อคอลัมน์ที่ลงท้ายด้วย key (เช่น 'GC=F_Open' หรือ 'Open_GC=F')
+                if s.endswith(key):
+                    suffix.setdefault(key, c)
+                # มีคำว่า key อยู่ข้างใน
+                if key in s:
+                    contains.setdefault(key, c)
+
+        def _pick(key: str) -> pd.Series:
+            key = key.lower()
+            # ตรงตัวก่อน → ลงท้ายด้วย → มีอยู่ข้างใน
+            for table in (exact, suffix, contains):
+                if key in table:
+                    return df[table[key]]
+            raise KeyError(key)
+        return _pick
+
+    def _from_yf(sym: str, period: str) -> pd.DataFrame:
+        import yfinance as yf
+        # พยายามแบบ download ก่อน (บังคับ group_by="column" เพื่อลด MultiIndex แบบ ticker)
+        df0 = yf.download(
+            sym, interval=INTERVAL, period=period,
+            progress=False, auto_adjust=False, threads=False, group_by="column",
+            session=_yf_session()
+        )
+        if df0 is None or df0.empty:
+            raise RuntimeError("empty")
 
-    last_err = None
-    for sym in candidates:
+        df0 = _flatten(df0).reset_index()
+
+        # normalize เป็น o/h/l/c/v + time
         try:
-            # พยายามแบบ download ก่อน (บังคับ group_by="column" เพื่อลด MultiIndex แบบ ticker)
-            df0 = yf.download(
-                sym, interval=INTERVAL, period=PERIOD,
-                progress=False, auto_adjust=False, threads=False, group_by="column"
-            )
-            if df0 is None or df0.empty:
-                raise RuntimeError("empty")
+            pick = _picker(df0)
+            o = pick("open")
+            h = pick("high")
+            l = pick("low")
+            c = pick("close")
+        except KeyError:
+            # บางเคสคอลัมน์เพี้ยนมาก ลอง history() อีกแบบ
+            tkr = yf.Ticker(sym, session=_yf_session())
+            dfh = tkr.history(period=period, interval=INTERVAL, auto_adjust=False)
+            if dfh is None or dfh.empty:
+                raise RuntimeError("history empty")
+            df0 = _flatten(dfh).reset_index()
+            pick = _picker(df0)
+            o = pick("open")
+            h = pick("high")
+            l = pick("low")
+            c = pick("close")
 
-            df0 = _flatten(df0).reset_index()
+        try:
+            v = pick("volume")
+        except KeyError:
+            # ไม่มี volume ก็สร้างศูนย์ให้
+            v = pd.Series([0]*len(df0), index=df0.index, name="Volume")
+
+        out = pd.DataFrame({"o": o, "h": h, "l": l, "c": c, "v": v})
+        # หา column เวลา (ปกติเป็น datetime64 อยู่แล้ว → ใช้ .values แปลงทั้งก้อน ไม่ parse ทีละแถว)
+        if "Datetime" in df0.columns:
+            t = df0["Datetime"]
+        elif "Date" in df0.columns:
+            t = df0["Date"]
+        else:
+            t = df0.iloc[:, 0]
+        out.insert(0, "time", pd.to_datetime(t.values, utc=True, cache=True))
+
+        for col in ["o", "h", "l", "c", "v"]:
+            out[col] = pd.to_numeric(out[col], errors="coerce")
+        return out
 
-            # normalize เป็น o/h/l/c/v + time
-            try:
-                o = _pick(df0, "open")
-                h = _pick(df0, "high")
-                l = _pick(df0, "low")
-                c = _pick(df0, "close")
-            except KeyError:
-                # บางเคสคอลัมน์เพี้ยนมาก ลอง history() อีกแบบ
-                tkr = yf.Ticker(sym)
-                dfh = tkr.history(period=PERIOD, interval=INTERVAL, auto_adjust=False)
-                if dfh is None or dfh.empty:
-                    raise RuntimeError("history empty")
-                df0 = _flatten(dfh).reset_index()
-                o = _pick(df0, "open")
-                h = _pick(df0, "high")
-                l = _pick(df0, "low")
-                c = _pick(df0, "close")
+    last_err = None
+    for sym in candidates:
+        try:
+            # มี cache ที่ยังใหม่ → ดึงแค่ช่วงสั้น ๆ มาต่อท้าย
+            old    = _load_cache(sym)
+            period = PERIOD_INCR if old is not None else PERIOD
 
             try:
-                v = _pick(df0, "volume")
-            except KeyError:
-                # ไม่มี volume ก็สร้างศูนย์ให้
-                v = pd.Series([0]*len(df0), index=df0.index, name="Volume")
-
-            out = pd.DataFrame({"o": o, "h": h, "l": l, "c": c, "v": v})
-            # หา column เวลา
-            if "Datetime" in df0.columns:
-                out.insert(0, "time", pd.to_datetime(df0["Datetime"], utc=True))
-            elif "Date" in df0.columns:
-                out.insert(0, "time", pd.to_datetime(df0["Date"], utc=True))
-            else:
-                out.insert(0, "time", pd.to_datetime(df0.iloc[:, 0], utc=True))
+                out = _fetch_chart(sym, period)
+            except Exception as e:
+                # endpoint ตรงใช้ไม่ได้ → ถอยไปใช้ yfinance
+                print(f"[fetch] {sym} chart failed: {e} → yfinance")
+                out = _from_yf(sym, period)
 
             # ทำความสะอาด
-            for col in ["o", "h", "l", "c", "v"]:
-                out[col] = pd.to_numeric(out[col], errors="coerce")
-            out = out.dropna().reset_index(drop=True)
+            out = out.dropna()
+            if old is not None:
+                # แท่งซ้ำให้ใช้ค่าจากรอบนี้ (แท่งล่าสุดรอบก่อนอาจยังไม่ปิด)
+                out = pd.concat([old, out]).drop_duplicates("time", keep="last").sort_values("time")
+            out = out.reset_index(drop=True)
             if len(out) > BARS:
-                out = out.tail(BARS).copy()
+                out = out.iloc[-BARS:]  # view ไม่ต้อง copy
 
+            _save_cache(sym, out)
             out.attrs["symbol"] = sym
             return out
 
@@ -142,27 +313,66 @@ def fetch_df(candidates: list[str]) -> pd.DataFrame:
     raise RuntimeError(f"all candidates failed: {last_err}")
 
 
+@functools.cache
+def _load_kernels():
+    # ใช้ kernel ที่ build แบบ AOT ไว้แล้ว (python _kernels.py) ถ้ามี, ไม่งั้น JIT + cache ลงดิสก์
+    try:
+        from xau_kernels import compute_all, step
+    except ImportError:
+        os.environ.setdefault("NUMBA_CACHE_DIR", os.path.expanduser("~/.numba_cache"))
+        from _kernels import compute_all, step
+    return compute_all, step
+
+# ลำดับคอลัมน์ตาม out ของ compute_all / row ของ step
+COLS = ("ema_fast", "ema_slow", "rsi", "macd", "macd_signal", "macd_hist", "atr")
+
+def _state_path(sym: str) -> str:
+    return os.path.join(CACHE_DIR, f"xau_state_{sym}.pkl")
+
+@disk_memoize()
 def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    out["ema_fast"] = EMAIndicator(out["c"], FAST_EMA).ema_indicator()
-    out["ema_slow"] = EMAIndicator(out["c"], SLOW_EMA).ema_indicator()
-    out["rsi"]      = RSIIndicator(out["c"], RSI_LEN).rsi()
-    macd = MACD(out["c"])  # 12/26/9
-    out["macd"]        = macd.macd()
-    out["macd_signal"] = macd.macd_signal()
-    out["macd_hist"]   = out["macd"] - out["macd_signal"]
-    out["atr"]         = AverageTrueRange(out["h"], out["l"], out["c"], ATR_LEN).average_true_range()
-    return out.dropna().reset_index(drop=True)
-
-def generate_signal(prev, now):
-    cross_up = (prev["ema_fast"] <= prev["ema_slow"]) and (now["ema_fast"] >  now["ema_slow"])
-    cross_dn = (prev["ema_fast"] >= prev["ema_slow"]) and (now["ema_fast"] <  now["ema_slow"])
-    # ฟิลเตอร์เข้มขึ้นด้วย RSI และ MACD histogram
-    buy_ok  = (now["rsi"] >= RSI_BUY_MIN)  and (now["macd_hist"] >= MACD_HIST_MIN) and (now["macd"] > now["macd_signal"])
-    sell_ok = (now["rsi"] <= RSI_SELL_MAX) and (now["macd_hist"] <= -MACD_HIST_MIN) and (now["macd"] < now["macd_signal"])
-    if cross_up and buy_ok:  return "BUY"
-    if cross_dn and sell_ok: return "SELL"
-    return "WAIT"
+    # คืนเฉพาะ 2 แท่งท้าย (prev/now) พร้อมคอลัมน์อินดิเคเตอร์ — ไม่เติมคอลัมน์ทั้ง frame
+    n = len(df)
+    if n < 2:
+        return df
+    compute_all, step = _load_kernels()
+    # ราคาเข้า kernel เป็น float32 (ลด memory ครึ่งหนึ่ง), state/ผลลัพธ์ยังสะสมเป็น float64
+    c = df["c"].to_numpy(np.float32)
+    h = df["h"].to_numpy(np.float32)
+    l = df["l"].to_numpy(np.float32)
+    times   = df["time"]
+    periods = (FAST_EMA, SLOW_EMA, RSI_LEN, ATR_LEN)
+    start   = 0
+
+    # มี state จากรอบก่อน (ณ แท่งก่อนสุดท้าย) และแท่งใหม่ไม่เยอะ → ป้อนต่อเฉพาะแท่งใหม่
+    sym = df.attrs.get("symbol", "")
+    st  = StreamingIndicators.load(sym, _state_path(sym))
+    if st is not None and st.periods == periods and st.time is not None:
+        pos = int(times.searchsorted(st.time))
+        if pos < n and times.iloc[pos] == st.time and 1 <= n - 1 - pos <= STATE_MAX_GAP:
+            start = pos + 1
+    if start == 0:
+        st = StreamingIndicators(periods)  # ไม่มี/ใช้ไม่ได้ → reseed จากทั้ง frame
+
+    # ป้อนถึงแท่งก่อนสุดท้ายเข้า state (แท่งสุดท้ายอาจยังไม่ปิด → peek บนสำเนา)
+    st.update(compute_all, times.iloc[n-2], h[start:n-1], l[start:n-1], c[start:n-1])
+    now_row = st.peek(step, h[n-1], l[n-1], c[n-1])
+
+    out = df.iloc[-2:].copy()
+    for j, col in enumerate(COLS):
+        out[col] = (st.row[j], now_row[j])
+    out.attrs["state"] = st
+    return out
+
+SIDES = {1: "BUY", -1: "SELL", 0: "WAIT"}
+
+def generate_signal(df: pd.DataFrame) -> str:
+    # คำนวณทั้งช่วงท้ายแบบ array แล้วใช้แท่งล่าสุด
+    tail = df.iloc[-2:]
+    out = signals(tail["ema_fast"].to_numpy(), tail["ema_slow"].to_numpy(), tail["rsi"].to_numpy(),
+                  tail["macd"].to_numpy(), tail["macd_signal"].to_numpy(), tail["macd_hist"].to_numpy(),
+                  RSI_BUY_MIN, RSI_SELL_MAX, MACD_HIST_MIN)
+    return SIDES[int(out[-1])]
 
 def last_bar_is_fresh(last_time_utc) -> bool:
     now_utc = datetime.now(timezone.utc)
@@ -173,33 +383,39 @@ def run_for(candidates: list[str]):
     df  = add_indicators(fetch_df(candidates))
     if len(df) < 2: return
     prev, now = df.iloc[-2], df.iloc[-1]
+    if math.isnan(prev["ema_slow"]): return  # แท่งยังไม่พอ warm-up
     sym  = df.attrs.get("symbol", candidates[0])
-    side = generate_signal(prev, now)
+    side = generate_signal(df)
+    if "state" in df.attrs:
+        df.attrs["state"].save(sym, _state_path(sym))
 
-    bkk   = pd.to_datetime(now["time"]).tz_convert(ZoneInfo("Asia/Bangkok"))
-    bkk_s = bkk.strftime("%Y-%m-%d %H:%M")
+    fresh = last_bar_is_fresh(now["time"])
+    bkk_s = now["time"].astimezone(BKK).strftime("%Y-%m-%d %H:%M")
+    print(f"{bkk_s} TH | {sym}/5m close {now['c']:.2f}{'' if fresh else ' (stale)'} → {side}")
 
-    if not last_bar_is_fresh(now["time"]):
-        print(f"{bkk_s} TH | {sym}/5m close {now['c']:.2f} (stale) → {side}")
+    # WAIT (เคสส่วนใหญ่) หรือแท่งเก่า → จบเลย ไม่ต้องประกอบข้อความ
+    if side == "WAIT" or not fresh:
         return
 
-    print(f"{bkk_s} TH | {sym}/5m close {now['c']:.2f} → {side}")
-    if side in ("BUY","SELL"):
-        msg = (f"[{sym} 5m] {side}\n"
-               f"Time (TH) {bkk_s}\n"
-               f"Close {now['c']:.2f}\n"
-               f"EMA20/50 {now['ema_fast']:.2f}/{now['ema_slow']:.2f}\n"
-               f"RSI {now['rsi']:.1f} | MACD {now['macd']:.4f}/{now['macd_signal']:.4f} "
-               f"| HIST {now['macd_hist']:.4f}\n"
-               f"ATR {now['atr']:.2f}")
-        send_tg(msg)
+    msg = (f"[{sym} 5m] {side}\n"
+           f"Time (TH) {bkk_s}\n"
+           f"Close {now['c']:.2f}\n"
+           f"EMA20/50 {now['ema_fast']:.2f}/{now['ema_slow']:.2f}\n"
+           f"RSI {now['rsi']:.1f} | MACD {now['macd']:.4f}/{now['macd_signal']:.4f} "
+           f"| HIST {now['macd_hist']:.4f}\n"
+           f"ATR {now['atr']:.2f}")
+    send_tg(msg)
+
+def _run_group(group: list[str]):
+    try:
+        run_for(group)
+    except Exception as e:
+        print(f"[run] {group} error: {e}")
 
 def main():
-    for group in INSTRUMENTS:
-        try:
-            run_for(group)
-        except Exception as e:
-            print(f"[run] {group} error: {e}")
+    # แต่ละชุดเป็นอิสระกัน (ส่วนใหญ่รอ network) → เช็คพร้อมกันด้วย thread
+    with ThreadPoolExecutor(max_workers=max(1, len(INSTRUMENTS))) as pool:
+        list(pool.map(_run_group, INSTRUMENTS))
 
 if __name__ == "__main__":
     main()